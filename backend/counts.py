@@ -0,0 +1,101 @@
+"""
+Cheap totals for the paginated list and search endpoints.
+
+Exact totals are cached per query for COUNT_CACHE_TTL seconds and dropped
+whenever this process creates or deletes an inquiry, so paging through a
+result set costs one COUNT(*) instead of one per page. Approximate totals
+read the database's table statistics, or cap filtered counts.
+"""
+import os
+import threading
+import time
+from typing import Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Query, Session
+
+COUNT_CACHE_TTL = float(os.getenv('COUNT_CACHE_TTL', '30'))
+APPROXIMATE_COUNT_CAP = int(os.getenv('APPROXIMATE_COUNT_CAP', '10000'))
+COUNT_CACHE_MAX_ENTRIES = int(os.getenv('COUNT_CACHE_MAX_ENTRIES', '1024'))
+
+_cache = {}
+_cache_version = 0
+_lock = threading.Lock()
+
+
+def invalidate():
+    """Drop cached totals after a write"""
+    global _cache_version
+    with _lock:
+        _cache_version += 1
+        _cache.clear()
+
+
+def cached_count(key, query: Query) -> int:
+    """Exact COUNT of a query, reused for COUNT_CACHE_TTL seconds"""
+    now = time.monotonic()
+    with _lock:
+        entry = _cache.get(key)
+        if entry and entry[0] > now:
+            return entry[1]
+        version = _cache_version
+
+    total = query.order_by(None).count()
+
+    with _lock:
+        # Don't cache a count that raced with a write
+        if version == _cache_version:
+            _cache.pop(key, None)
+            _cache[key] = (now + COUNT_CACHE_TTL, total)
+            _prune(now)
+    return total
+
+
+def _prune(now: float):
+    """Drop expired entries, then the oldest ones beyond COUNT_CACHE_MAX_ENTRIES (caller holds _lock)"""
+    for key in [key for key, (expires, _) in _cache.items() if expires <= now]:
+        del _cache[key]
+    # Dicts keep insertion order and every write re-inserts its key, so the
+    # first keys are the oldest
+    while len(_cache) > COUNT_CACHE_MAX_ENTRIES:
+        del _cache[next(iter(_cache))]
+
+
+def bounded_count(query: Query, cap: int = APPROXIMATE_COUNT_CAP) -> Tuple[int, bool]:
+    """Count at most cap rows; returns (count, whether the cap was hit)"""
+    total = query.order_by(None).limit(cap + 1).count()
+    if total > cap:
+        return cap, True
+    return total, False
+
+
+def table_row_estimate(db: Session, table_name: str) -> Optional[int]:
+    """Row count from table statistics, or None if the database has none"""
+    dialect = db.get_bind().dialect.name
+    if dialect == "mysql":
+        sql = "SELECT TABLE_ROWS FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :name"
+    elif dialect == "postgresql":
+        sql = "SELECT reltuples::bigint FROM pg_class WHERE relname = :name"
+    elif dialect == "sqlite":
+        # Populated by ANALYZE; the first number of each stat row is the table size
+        sql = "SELECT CAST(stat AS INTEGER) FROM sqlite_stat1 WHERE tbl = :name LIMIT 1"
+    else:
+        return None
+
+    if dialect == "sqlite":
+        has_stats = db.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'")
+        ).first()
+        if not has_stats:
+            return None
+
+    try:
+        # Savepoint so a failed lookup doesn't roll back (and expire) the caller's session
+        with db.begin_nested():
+            estimate = db.execute(text(sql), {"name": table_name}).scalar()
+    except SQLAlchemyError:
+        return None
+    if estimate is None or estimate < 0:
+        return None
+    return int(estimate)
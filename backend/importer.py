@@ -0,0 +1,237 @@
+"""
+Offline bulk importer for contact inquiries (CSV or NDJSON).
+
+Rows are streamed from the input file, validated in parallel worker
+processes with schemas.ContactInquiryCreate and inserted in multi-row
+chunks. Rejected rows go to a side file. Progress is checkpointed in the
+import_checkpoints table in the same transaction as each chunk, so an
+interrupted import can be re-run with the same arguments and picks up
+exactly where it stopped, without duplicate rows or rejects.
+
+Usage (from the backend directory):
+    python importer.py leads.csv --chunk-size 5000 --workers 4
+    python importer.py leads.ndjson --database-url sqlite:///./local.db
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from collections import Counter, deque
+from datetime import datetime, timezone
+from itertools import islice
+from multiprocessing import Pool
+from pathlib import Path
+
+from pydantic import ValidationError
+
+import schemas
+
+# Also accept the column names written by /api/export/contacts?format=csv
+HEADER_ALIASES = {
+    "full name": "full_name",
+    "name": "full_name",
+    "phone": "phone_number",
+    "contact method": "preferred_contact_method",
+    "created at": "created_at",
+}
+
+
+def read_rows(path: Path, file_format: str):
+    """Yield raw rows: dicts for CSV, unparsed lines for NDJSON"""
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        if file_format == "csv":
+            yield from csv.DictReader(f)
+        else:
+            # Parsed in validate_chunk so a malformed line becomes a rejection
+            for line in f:
+                if line.strip():
+                    yield line.strip()
+
+
+def chunked(rows, size: int, start: int):
+    """Group rows into lists of (row_number, row) tuples"""
+    row_number = start
+    while True:
+        chunk = []
+        for row in islice(rows, size):
+            row_number += 1
+            chunk.append((row_number, row))
+        if not chunk:
+            return
+        yield chunk
+
+
+def normalize_row(row: dict) -> dict:
+    normalized = {}
+    for key, value in row.items():
+        if key is None:
+            continue
+        key = key.strip().lower()
+        key = HEADER_ALIASES.get(key, key)
+        if isinstance(value, str):
+            value = value.strip()
+        normalized[key] = value if value != "" else None
+    return normalized
+
+
+def parse_created_at(value):
+    if value is None:
+        return None
+    created_at = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    if created_at.tzinfo is not None:
+        created_at = created_at.astimezone(timezone.utc).replace(tzinfo=None)
+    return created_at
+
+
+def validate_chunk(chunk):
+    """
+    Validate a chunk of rows; runs in worker processes.
+    Returns (valid rows ready for insert, rejected rows with errors).
+    """
+    valid = []
+    rejected = []
+    for row_number, raw in chunk:
+        try:
+            parsed = json.loads(raw) if isinstance(raw, str) else raw
+            if not isinstance(parsed, dict):
+                raise ValueError("Row must be a JSON object")
+            row = normalize_row(parsed)
+            inquiry = schemas.ContactInquiryCreate(**row)
+            values = inquiry.dict()
+            values["created_at"] = parse_created_at(row.get("created_at"))
+            valid.append(values)
+        except ValidationError as e:
+            errors = [f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in e.errors()]
+            rejected.append({"row": row_number, "errors": errors, "data": raw})
+        except (ValueError, TypeError, AttributeError) as e:
+            rejected.append({"row": row_number, "errors": [str(e)], "data": raw})
+    return valid, rejected
+
+
+def run_import(args):
+    source = Path(args.input).resolve()
+    file_format = args.format or ("csv" if source.suffix.lower() == ".csv" else "ndjson")
+    rejects_path = Path(args.rejects or f"{source}.rejects.ndjson")
+
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    # Imported here so validation workers never open database connections
+    from sqlalchemy import func, insert, select
+    import models, rollups
+    from database import SessionLocal, engine
+
+    models.Base.metadata.create_all(bind=engine)
+    table = models.ContactInquiry.__table__
+
+    with SessionLocal() as db:
+        # Count inquiries already in the database before adding imported ones
+        rollups.ensure_rollups(db)
+
+        checkpoint = db.get(models.ImportCheckpoint, str(source))
+        if checkpoint and args.restart:
+            db.delete(checkpoint)
+            db.commit()
+            checkpoint = None
+        if checkpoint is None:
+            checkpoint = models.ImportCheckpoint(
+                source=str(source), rows_done=0, inserted=0, rejected=0, rejects_offset=0
+            )
+            db.add(checkpoint)
+            db.commit()
+        resuming = checkpoint.rows_done > 0
+
+        rows = read_rows(source, file_format)
+        for _ in islice(rows, checkpoint.rows_done):
+            pass
+        if resuming:
+            print(f"Resuming after row {checkpoint.rows_done}", file=sys.stderr)
+
+        started = time.monotonic()
+        processed = 0
+
+        def handle(result, rejects_file):
+            nonlocal processed
+            valid, rejected = result
+            # Rejects are written first and their end offset committed with the
+            # chunk; a resumed run truncates anything written after that.
+            for rejection in rejected:
+                rejects_file.write((json.dumps(rejection, default=str) + "\n").encode("utf-8"))
+            rejects_file.flush()
+
+            if valid:
+                # Publish a floor below this chunk's ids before inserting, so
+                # snapshot watermarks stay below rows that are not committed yet
+                checkpoint.in_flight_floor = db.execute(select(func.max(table.c.id))).scalar() or 0
+                db.commit()
+
+                now = datetime.utcnow()
+                counts = Counter()
+                for values in valid:
+                    values["created_at"] = values["created_at"] or now
+                    counts[(rollups.bucket_for(values["created_at"]), values["preferred_contact_method"])] += 1
+                db.execute(insert(table), valid)
+                rollups.apply_counts(db, counts)
+            checkpoint.rows_done += len(valid) + len(rejected)
+            checkpoint.inserted += len(valid)
+            checkpoint.rejected += len(rejected)
+            checkpoint.rejects_offset = rejects_file.tell()
+            checkpoint.in_flight_floor = None
+            db.commit()
+
+            processed += len(valid) + len(rejected)
+            rate = processed / max(time.monotonic() - started, 1e-6)
+            print(
+                f"\r{checkpoint.rows_done} rows ({checkpoint.inserted} inserted, "
+                f"{checkpoint.rejected} rejected) {rate:,.0f} rows/s",
+                end="", file=sys.stderr, flush=True
+            )
+
+        chunks = chunked(rows, args.chunk_size, checkpoint.rows_done)
+        with open(rejects_path, "ab" if resuming else "wb") as rejects_file:
+            rejects_file.seek(0, os.SEEK_END)
+            if rejects_file.tell() > checkpoint.rejects_offset:
+                rejects_file.truncate(checkpoint.rejects_offset)
+                rejects_file.seek(0, os.SEEK_END)
+
+            if args.workers <= 1:
+                for chunk in chunks:
+                    handle(validate_chunk(chunk), rejects_file)
+            else:
+                with Pool(args.workers) as pool:
+                    # Bounded in-flight window keeps memory flat and results in input order
+                    pending = deque()
+                    for chunk in chunks:
+                        pending.append(pool.apply_async(validate_chunk, (chunk,)))
+                        if len(pending) >= args.workers * 2:
+                            handle(pending.popleft().get(), rejects_file)
+                    while pending:
+                        handle(pending.popleft().get(), rejects_file)
+
+        print(file=sys.stderr)
+        print(
+            f"Done: {checkpoint.inserted} inserted, {checkpoint.rejected} rejected "
+            f"(see {rejects_path})"
+        )
+        db.delete(checkpoint)
+        db.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import contact inquiries from CSV or NDJSON")
+    parser.add_argument("input", help="Path to a .csv or .ndjson file")
+    parser.add_argument("--format", choices=["csv", "ndjson"], help="Input format (default: from file extension)")
+    parser.add_argument("--chunk-size", type=int, default=5000, help="Rows per validation/insert chunk")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Validation processes")
+    parser.add_argument("--rejects", help="Side file for rejected rows (default: <input>.rejects.ndjson)")
+    parser.add_argument("--restart", action="store_true", help="Ignore any existing checkpoint")
+    parser.add_argument("--database-url", help="Override DATABASE_URL for this import")
+    args = parser.parse_args()
+    if args.chunk_size < 1:
+        parser.error("--chunk-size must be positive")
+    run_import(args)
+
+
+if __name__ == "__main__":
+    main()
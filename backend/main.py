@@ -3,19 +3,24 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from sqlalchemy.orm import Session
 from typing import List, Optional
-import models, schemas
+import models, schemas, rollups, retention, counts
 from database import SessionLocal, engine, get_db
 import os
 from pathlib import Path
 from sqlalchemy import desc, func
-from datetime import datetime, timedelta
-from fastapi.responses import FileResponse, HTMLResponse
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from fastapi.responses import FileResponse, HTMLResponse, Response
 from pathlib import Path
 
 
 # Create database tables
 models.Base.metadata.create_all(bind=engine)
 
+# Backfill timeseries rollups for inquiries created before the rollup table existed
+with SessionLocal() as _db:
+    rollups.ensure_rollups(_db)
+
 app = FastAPI(title="Luxury Contact Form API", version="1.0.0")
 
 # CORS middleware
@@ -70,7 +75,11 @@ async def create_contact_inquiry(
     try:
         db_inquiry = models.ContactInquiry(**inquiry.dict())
         db.add(db_inquiry)
+        db.flush()
+        db.refresh(db_inquiry)
+        rollups.record_inquiry(db, db_inquiry)
         db.commit()
+        counts.invalidate()
         db.refresh(db_inquiry)
         return db_inquiry
     except Exception as e:
@@ -80,13 +89,14 @@ async def create_contact_inquiry(
             detail=f"Error creating inquiry: {str(e)}"
         )
 
-@app.get("/api/contacts", response_model=List[schemas.ContactInquiryResponse])
+@app.get("/api/contacts", response_model=schemas.PaginatedResponse)
 async def get_all_contacts(
     db: Session = Depends(get_db),
     skip: int = Query(0, description="Number of records to skip"),
     limit: int = Query(100, description="Number of records to return"),
     sort_by: str = Query("created_at", description="Field to sort by"),
-    sort_order: str = Query("desc", description="Sort order: asc or desc")
+    sort_order: str = Query("desc", description="Sort order: asc or desc"),
+    approximate: bool = Query(False, description="Estimate the total from table statistics")
 ):
     """
     Get all contact inquiries with pagination and sorting
@@ -106,13 +116,27 @@ async def get_all_contacts(
         if sort_order == "desc":
             order_column = desc(order_column)
         
-        contacts = db.query(models.ContactInquiry)\
-                    .order_by(order_column)\
+        # Count before loading the page so the estimate lookup can't affect the loaded rows
+        query = db.query(models.ContactInquiry)
+        total = None
+        if approximate:
+            total = counts.table_row_estimate(db, models.ContactInquiry.__tablename__)
+        is_approximate = total is not None
+        if total is None:
+            total = counts.cached_count("contacts", query)
+        
+        contacts = query.order_by(order_column)\
                     .offset(skip)\
                     .limit(limit)\
                     .all()
         
-        return contacts
+        return {
+            "skip": skip,
+            "limit": limit,
+            "total": total,
+            "approximate": is_approximate,
+            "contacts": contacts
+        }
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -130,7 +154,11 @@ async def get_contact_by_id(contact_id: int, db: Session = Depends(get_db)):
     return contact
 
 @app.get("/api/contacts/email/{email}", response_model=List[schemas.ContactInquiryResponse])
-async def get_contacts_by_email(email: str, db: Session = Depends(get_db)):
+async def get_contacts_by_email(
+    email: str,
+    db: Session = Depends(get_db),
+    include_archived: bool = Query(True, description="Also return inquiries moved to the archive")
+):
     """
     Get all contact inquiries by email address
     """
@@ -138,13 +166,22 @@ async def get_contacts_by_email(email: str, db: Session = Depends(get_db)):
                 .filter(models.ContactInquiry.email == email)\
                 .order_by(desc(models.ContactInquiry.created_at))\
                 .all()
+    if include_archived:
+        archived = db.query(models.ContactInquiryArchive)\
+                    .filter(models.ContactInquiryArchive.email == email)\
+                    .order_by(desc(models.ContactInquiryArchive.created_at))\
+                    .all()
+        contacts = retention.merge_archived(contacts, archived)
     return contacts
 
-@app.get("/api/contacts/search/{search_term}", response_model=List[schemas.ContactInquiryResponse])
+@app.get("/api/contacts/search/{search_term}", response_model=schemas.SearchResponse)
 async def search_contacts(
     search_term: str, 
     db: Session = Depends(get_db),
-    field: str = Query("all", description="Search field: all, name, email, message")
+    field: str = Query("all", description="Search field: all, name, email, message"),
+    skip: int = Query(0, description="Number of records to skip"),
+    limit: int = Query(100, description="Number of records to return"),
+    approximate: bool = Query(False, description=f"Stop counting matches at {counts.APPROXIMATE_COUNT_CAP}")
 ):
     """
     Search contacts by various fields
@@ -159,8 +196,25 @@ async def search_contacts(
         elif field == "message" or field == "all":
             query = query.filter(models.ContactInquiry.message.ilike(f"%{search_term}%"))
         
-        contacts = query.order_by(desc(models.ContactInquiry.created_at)).all()
-        return contacts
+        contacts = query.order_by(desc(models.ContactInquiry.created_at))\
+                    .offset(skip)\
+                    .limit(limit)\
+                    .all()
+        
+        if approximate:
+            total, is_approximate = counts.bounded_count(query)
+        else:
+            total, is_approximate = counts.cached_count(("search", field, search_term), query), False
+        
+        return {
+            "search_term": search_term,
+            "field": field,
+            "skip": skip,
+            "limit": limit,
+            "count": total,
+            "approximate": is_approximate,
+            "results": contacts
+        }
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -191,13 +245,18 @@ async def get_contact_stats(
             month_ago = now - timedelta(days=30)
             query = query.filter(models.ContactInquiry.created_at >= month_ago)
         
-        total_contacts = query.count()
-        
-        # Count by contact method
-        contact_methods = query.with_entities(
-            models.ContactInquiry.preferred_contact_method,
-            func.count(models.ContactInquiry.id)
-        ).group_by(models.ContactInquiry.preferred_contact_method).all()
+        if period in ("today", "week", "month"):
+            total_contacts = query.count()
+            
+            # Count by contact method
+            contact_methods = query.with_entities(
+                models.ContactInquiry.preferred_contact_method,
+                func.count(models.ContactInquiry.id)
+            ).group_by(models.ContactInquiry.preferred_contact_method).all()
+        else:
+            # All-time totals come from the rollups, which still count archived inquiries
+            contact_methods = rollups.method_totals(db)
+            total_contacts = sum(contact_methods.values())
         
         # Recent contacts (last 5)
         recent_contacts = db.query(models.ContactInquiry)\
@@ -226,6 +285,47 @@ async def get_contact_stats(
             detail=f"Error fetching stats: {str(e)}"
         )
 
+@app.get("/api/stats/timeseries", response_model=schemas.ContactTimeseries)
+async def get_contact_timeseries(
+    db: Session = Depends(get_db),
+    start: Optional[datetime] = Query(None, description="Range start (inclusive), defaults to 30 days before end"),
+    end: Optional[datetime] = Query(None, description="Range end (exclusive), defaults to now"),
+    bucket: str = Query("day", description="Bucket size: hour, day, week"),
+    tz: str = Query("UTC", description="IANA timezone for bucket boundaries and naive start/end")
+):
+    """
+    Get inquiry counts over time, bucketed and broken down by contact method
+    """
+    try:
+        zone = ZoneInfo(tz)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise HTTPException(status_code=400, detail=f"Unknown timezone: {tz}")
+
+    end = end.replace(tzinfo=zone) if end and end.tzinfo is None else end
+    start = start.replace(tzinfo=zone) if start and start.tzinfo is None else start
+    end = end or datetime.now(timezone.utc)
+    start = start or end - timedelta(days=30)
+    # Rollups have quarter-hour resolution; snap so the echoed range is the one counted
+    start, end = rollups.snap_to_bucket(start), rollups.snap_to_bucket(end)
+
+    try:
+        series = rollups.timeseries(db, start, end, bucket, zone)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error fetching timeseries: {str(e)}"
+        )
+
+    return {
+        "start": start,
+        "end": end,
+        "bucket": bucket,
+        "timezone": tz,
+        "series": series
+    }
+
 @app.get("/api/contacts/recent")
 async def get_recent_contacts(
     db: Session = Depends(get_db),
@@ -254,8 +354,10 @@ async def delete_contact(contact_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Contact not found")
     
     try:
+        rollups.record_inquiry(db, contact, delta=-1)
         db.delete(contact)
         db.commit()
+        counts.invalidate()
         return {"message": "Contact deleted successfully"}
     except Exception as e:
         db.rollback()
@@ -267,12 +369,37 @@ async def delete_contact(contact_id: int, db: Session = Depends(get_db)):
 @app.get("/api/export/contacts")
 async def export_contacts(
     db: Session = Depends(get_db),
-    format: str = Query("json", description="Export format: json, csv")
+    format: str = Query("json", description="Export format: json, csv, parquet"),
+    include_archived: bool = Query(True, description="Also export inquiries moved to the archive"),
+    since: Optional[int] = Query(None, description="Only export inquiries with an id above this watermark")
 ):
     """
-    Export all contacts in JSON or CSV format
+    Export all contacts in JSON, CSV or Parquet format
     """
-    contacts = db.query(models.ContactInquiry).order_by(desc(models.ContactInquiry.created_at)).all()
+    if format == "parquet":
+        import snapshots
+        
+        data, watermark = snapshots.write_snapshot(db, since, include_archived)
+        filename = f"contacts_snapshot_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.parquet"
+        return Response(
+            content=data,
+            media_type="application/vnd.apache.parquet",
+            headers={
+                "Content-Disposition": f'attachment; filename="{filename}"',
+                "X-Export-Watermark": str(watermark)
+            }
+        )
+    
+    query = db.query(models.ContactInquiry)
+    if since is not None:
+        query = query.filter(models.ContactInquiry.id > since)
+    contacts = query.order_by(desc(models.ContactInquiry.created_at)).all()
+    if include_archived:
+        archived_query = db.query(models.ContactInquiryArchive)
+        if since is not None:
+            archived_query = archived_query.filter(models.ContactInquiryArchive.id > since)
+        archived = archived_query.order_by(desc(models.ContactInquiryArchive.created_at)).all()
+        contacts = retention.merge_archived(contacts, archived)
     
     if format == "csv":
         import csv
@@ -425,7 +552,7 @@ def create_simple_admin():
             async function loadContacts() {
                 try {
                     const response = await fetch(`${API_BASE}/contacts?limit=100`);
-                    const contacts = await response.json();
+                    const contacts = (await response.json()).contacts;
                     
                     if (contacts.length === 0) {
                         document.getElementById('contactsList').innerHTML = '<div class="stat-card">No contacts found</div>';
@@ -483,7 +610,8 @@ def create_simple_admin():
                 
                 try {
                     const response = await fetch(`${API_BASE}/contacts/search/${searchTerm}?field=all`);
-                    const contacts = await response.json();
+                    const search = await response.json();
+                    const contacts = search.results;
                     
                     if (contacts.length === 0) {
                         document.getElementById('contactsList').innerHTML = '<div class="stat-card">No contacts found for "' + searchTerm + '"</div>';
@@ -494,7 +622,7 @@ def create_simple_admin():
                     const contactsHTML = `
                         <div style="background: white; border-radius: 10px; overflow: hidden;">
                             <div style="padding: 15px; background: #f0f9ff; border-bottom: 1px solid #e5e7eb;">
-                                <strong>Search Results for "${searchTerm}" (${contacts.length} found)</strong>
+                                <strong>Search Results for "${searchTerm}" (${search.count} found)</strong>
                                 <button class="btn btn-primary" onclick="loadContacts()" style="float: right; padding: 5px 10px;">Show All</button>
                             </div>
                             <table>
@@ -4,6 +4,8 @@ from database import Base
 
 class ContactInquiry(Base):
     __tablename__ = "contact_inquiries"
+    # Never reuse ids of archived rows (SQLite otherwise reuses the highest rowid)
+    __table_args__ = {"sqlite_autoincrement": True}
     
     id = Column(Integer, primary_key=True, index=True)
     full_name = Column(String(255), nullable=False)
@@ -11,4 +13,38 @@ class ContactInquiry(Base):
     phone_number = Column(String(50), nullable=False)
     preferred_contact_method = Column(String(20), nullable=False)  # Phone/Email/WhatsApp
     message = Column(Text, nullable=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
\ No newline at end of file
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+# Cold tier: inquiries moved out of contact_inquiries by retention.py
+class ContactInquiryArchive(Base):
+    __tablename__ = "contact_inquiries_archive"
+    __table_args__ = {"mysql_row_format": "COMPRESSED"}
+
+    id = Column(Integer, primary_key=True, autoincrement=False)  # Keeps the original inquiry id
+    full_name = Column(String(255), nullable=False)
+    email = Column(String(255), nullable=False, index=True)
+    phone_number = Column(String(50), nullable=False)
+    preferred_contact_method = Column(String(20), nullable=False)
+    message = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    archived_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class ContactInquiryRollup(Base):
+    __tablename__ = "contact_inquiry_rollups"
+
+    bucket = Column(Integer, primary_key=True, autoincrement=False)  # UTC quarter-hours since epoch
+    phone_count = Column(Integer, nullable=False, default=0)
+    email_count = Column(Integer, nullable=False, default=0)
+    whatsapp_count = Column(Integer, nullable=False, default=0)
+
+# Progress of an importer.py run, committed together with each imported chunk
+class ImportCheckpoint(Base):
+    __tablename__ = "import_checkpoints"
+
+    source = Column(String(512), primary_key=True)  # Absolute path of the input file
+    rows_done = Column(Integer, nullable=False, default=0)
+    inserted = Column(Integer, nullable=False, default=0)
+    rejected = Column(Integer, nullable=False, default=0)
+    rejects_offset = Column(Integer, nullable=False, default=0)  # Bytes of the rejects file covered
+    in_flight_floor = Column(Integer, nullable=True)  # Max inquiry id before the uncommitted chunk, if any
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
\ No newline at end of file
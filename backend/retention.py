@@ -0,0 +1,122 @@
+"""
+Retention for contact_inquiries: moves inquiries older than the retention
+period into contact_inquiries_archive so the hot table stays small.
+
+Rows are moved in bounded batches (copy, delete, commit) so each
+transaction only locks a small slice of the table. Timeseries rollups are
+left untouched (and rollups.rebuild_rollups counts both tables), so
+/api/stats/timeseries still covers archived history.
+
+Usage (from the backend directory, e.g. from a nightly cron job):
+    python retention.py --months 12 --batch-size 1000
+"""
+import argparse
+import heapq
+import os
+import time
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.orm import Session
+
+import models
+from database import SessionLocal, engine
+
+RETENTION_MONTHS = int(os.getenv('RETENTION_MONTHS', '12'))
+RETENTION_BATCH_SIZE = int(os.getenv('RETENTION_BATCH_SIZE', '1000'))
+
+ARCHIVED_COLUMNS = [
+    "id", "full_name", "email", "phone_number",
+    "preferred_contact_method", "message", "created_at",
+]
+
+
+def months_ago(now: datetime, months: int) -> datetime:
+    """Same day and time N calendar months earlier (clamped to month end)"""
+    month_index = now.year * 12 + now.month - 1 - months
+    year, month = divmod(month_index, 12)
+    month += 1
+    next_month = datetime(year + month // 12, month % 12 + 1, 1)
+    last_day = (next_month - datetime(year, month, 1)).days
+    return now.replace(year=year, month=month, day=min(now.day, last_day))
+
+
+def archive_batch(db: Session, cutoff: datetime, after_id: int, batch_size: int,
+                  keep_id: Optional[int] = None) -> tuple:
+    """
+    Examine the next batch_size inquiries by id after after_id and move the
+    ones created before cutoff, never moving keep_id. Returns (last id
+    examined or None when the table is exhausted, rows moved).
+    """
+    hot = models.ContactInquiry.__table__
+    archive = models.ContactInquiryArchive.__table__
+
+    # Keyset pagination on the primary key bounds every transaction to one
+    # window of rows; created_at is not indexed and imported backfills give
+    # old inquiries high ids, so "oldest first" by id is not an option.
+    window = db.execute(
+        select(hot.c.id, hot.c.created_at)
+        .where(hot.c.id > after_id)
+        .order_by(hot.c.id)
+        .limit(batch_size)
+    ).all()
+    if not window:
+        return None, 0
+
+    ids = [
+        row.id for row in window
+        if row.id != keep_id and row.created_at is not None and row.created_at < cutoff
+    ]
+    if ids:
+        db.execute(insert(archive).from_select(
+            ARCHIVED_COLUMNS,
+            select(*[hot.c[column] for column in ARCHIVED_COLUMNS]).where(hot.c.id.in_(ids))
+        ))
+        db.execute(delete(hot).where(hot.c.id.in_(ids)))
+    db.commit()
+    return window[-1].id, len(ids)
+
+
+def run_retention(db: Session, months: int = RETENTION_MONTHS, batch_size: int = RETENTION_BATCH_SIZE,
+                  pause: float = 0.0) -> int:
+    """Archive everything older than the retention period; returns rows moved"""
+    cutoff = months_ago(datetime.utcnow(), months)
+    # MySQL 5.7 and older reset AUTO_INCREMENT to MAX(id) + 1 on restart. Keeping
+    # the newest inquiry hot keeps that above every archived id, so a restart
+    # can't hand out an id that already exists in the archive.
+    keep_id = db.execute(select(func.max(models.ContactInquiry.id))).scalar()
+    moved = 0
+    last_id = 0
+    while True:
+        last_id, batch = archive_batch(db, cutoff, last_id, batch_size, keep_id)
+        if last_id is None:
+            return moved
+        moved += batch
+        if pause and batch:
+            # Give concurrent writers a window between batches
+            time.sleep(pause)
+
+
+def merge_archived(hot_contacts, archived_contacts):
+    """Merge two lists of inquiries that are each sorted newest first"""
+    return list(heapq.merge(hot_contacts, archived_contacts, key=lambda c: c.created_at, reverse=True))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Archive old contact inquiries")
+    parser.add_argument("--months", type=int, default=RETENTION_MONTHS, help="Keep this many months in the hot table")
+    parser.add_argument("--batch-size", type=int, default=RETENTION_BATCH_SIZE, help="Rows moved per transaction")
+    parser.add_argument("--pause", type=float, default=0.0, help="Seconds to sleep between batches")
+    args = parser.parse_args()
+    if args.months < 1 or args.batch_size < 1:
+        parser.error("--months and --batch-size must be positive")
+
+    models.Base.metadata.create_all(bind=engine)
+    with SessionLocal() as db:
+        moved = run_retention(db, args.months, args.batch_size, args.pause)
+    print(f"Archived {moved} inquiries older than {args.months} months")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+from sqlalchemy import bindparam, func, insert, select, update
+from sqlalchemy.orm import Session
+
+import models
+
+# Rollups are kept at quarter-hour resolution so that local day/hour buckets
+# line up for every real-world UTC offset (e.g. +05:30, +05:45).
+BUCKET_SECONDS = 900
+
+# One count column per contact method keeps a whole quarter-hour in one row
+METHOD_COLUMNS = {
+    "Phone": "phone_count",
+    "Email": "email_count",
+    "WhatsApp": "whatsapp_count",
+}
+
+BUCKET_SIZES = {"hour": 3600, "day": 86400, "week": 7 * 86400}
+MAX_TIMESERIES_BUCKETS = 10000
+OFFSET_PROBE_SECONDS = 6 * 3600
+EPOCH = datetime(1970, 1, 1)
+
+# All-zero row written by rebuild_rollups; its presence means the backfill ran
+BACKFILL_MARKER_BUCKET = -1
+
+
+def bucket_for(created_at: datetime) -> int:
+    """Return the UTC quarter-hour bucket index for a timestamp (naive = UTC)"""
+    if created_at.tzinfo is None:
+        created_at = created_at.replace(tzinfo=timezone.utc)
+    return int(created_at.timestamp()) // BUCKET_SECONDS
+
+
+def _upsert(db: Session, rows: List[dict]):
+    """Add count deltas to existing buckets and insert new ones in one executemany"""
+    table = models.ContactInquiryRollup.__table__
+    dialect = db.get_bind().dialect.name
+    if dialect == "mysql":
+        from sqlalchemy.dialects.mysql import insert as mysql_insert
+
+        statement = mysql_insert(table)
+        statement = statement.on_duplicate_key_update(
+            {column: table.c[column] + statement.inserted[column] for column in METHOD_COLUMNS.values()}
+        )
+    else:
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+
+        statement = dialect_insert(table)
+        statement = statement.on_conflict_do_update(
+            index_elements=[table.c.bucket],
+            set_={column: table.c[column] + statement.excluded[column] for column in METHOD_COLUMNS.values()}
+        )
+    db.execute(statement, rows)
+
+
+def _update_then_insert(db: Session, rows: List[dict]):
+    """Portable fallback: one IN query, then executemany UPDATE and INSERT"""
+    table = models.ContactInquiryRollup.__table__
+    existing = set(db.execute(
+        select(table.c.bucket).where(table.c.bucket.in_([row["bucket"] for row in rows]))
+    ).scalars())
+    updates = [{"b_" + key: value for key, value in row.items()} for row in rows if row["bucket"] in existing]
+    inserts = [row for row in rows if row["bucket"] not in existing]
+    if updates:
+        db.execute(
+            update(table)
+            .where(table.c.bucket == bindparam("b_bucket"))
+            .values({column: table.c[column] + bindparam("b_" + column) for column in METHOD_COLUMNS.values()}),
+            updates
+        )
+    if inserts:
+        db.execute(insert(table), inserts)
+
+
+def apply_counts(db: Session, counts: Counter):
+    """
+    Add per-(bucket, contact method) deltas to the rollup table.
+    Does not commit; callers commit together with the inquiry rows.
+    """
+    per_bucket = defaultdict(lambda: dict.fromkeys(METHOD_COLUMNS.values(), 0))
+    for (bucket, method), delta in counts.items():
+        column = METHOD_COLUMNS.get(method)
+        if column and delta:
+            per_bucket[bucket][column] += delta
+    if not per_bucket:
+        return
+
+    rows = [{"bucket": bucket, **columns} for bucket, columns in per_bucket.items()]
+    if db.get_bind().dialect.name in ("mysql", "postgresql", "sqlite"):
+        _upsert(db, rows)
+    else:
+        _update_then_insert(db, rows)
+
+
+def record_inquiry(db: Session, inquiry: models.ContactInquiry, delta: int = 1):
+    """Count (or with delta=-1, uncount) a single inquiry in the rollups"""
+    created_at = inquiry.created_at or datetime.utcnow()
+    apply_counts(db, Counter({(bucket_for(created_at), inquiry.preferred_contact_method): delta}))
+
+
+def rebuild_rollups(db: Session, batch_size: int = 50000):
+    """
+    Recompute the rollup table from contact_inquiries and its archive.
+    Used to backfill rollups for rows that predate the table.
+    """
+    db.query(models.ContactInquiryRollup).delete(synchronize_session=False)
+    counts = defaultdict(Counter)
+    for table in (models.ContactInquiry, models.ContactInquiryArchive):
+        rows = db.query(table.created_at, table.preferred_contact_method)\
+                 .execution_options(yield_per=batch_size)
+        for created_at, method in rows:
+            column = METHOD_COLUMNS.get(method)
+            if created_at is not None and column:
+                counts[bucket_for(created_at)][column] += 1
+    counts[BACKFILL_MARKER_BUCKET] = Counter()
+    db.bulk_insert_mappings(models.ContactInquiryRollup, [
+        {"bucket": bucket, **{column: columns.get(column, 0) for column in METHOD_COLUMNS.values()}}
+        for bucket, columns in counts.items()
+    ])
+    db.commit()
+
+
+def ensure_rollups(db: Session):
+    """
+    Backfill the rollup table unless a previous rebuild has completed.
+    Rows written by inserts or imports before the backfill do not count as
+    a backfill, so the marker row is checked rather than emptiness.
+    """
+    marker = db.get(models.ContactInquiryRollup, BACKFILL_MARKER_BUCKET)
+    if marker is None:
+        rebuild_rollups(db)
+
+
+def method_totals(db: Session) -> dict:
+    """All-time inquiry counts per contact method, including archived inquiries"""
+    rollup = models.ContactInquiryRollup.__table__.c
+    sums = db.execute(select(*[func.sum(rollup[column]) for column in METHOD_COLUMNS.values()])).one()
+    return {method: int(total or 0) for method, total in zip(METHOD_COLUMNS, sums) if total}
+
+
+def snap_to_bucket(value: datetime) -> datetime:
+    """Round an aware datetime up to the next rollup (quarter-hour) boundary"""
+    seconds = int(-(-value.timestamp() // BUCKET_SECONDS)) * BUCKET_SECONDS
+    return datetime.fromtimestamp(seconds, value.tzinfo)
+
+
+def _utc_offset(utc_seconds: int, zone) -> int:
+    return int(datetime.fromtimestamp(utc_seconds, zone).utcoffset().total_seconds())
+
+
+def _next_transition(after: int, before: int, zone) -> int:
+    """First second in (after, before] whose offset differs from the one at after"""
+    offset = _utc_offset(after, zone)
+    while before - after > 1:
+        middle = (after + before) // 2
+        if _utc_offset(middle, zone) == offset:
+            after = middle
+        else:
+            before = middle
+    return before
+
+
+def _offset_segments(start_seconds: int, end_seconds: int, zone) -> List[tuple]:
+    """
+    Split [start, end) into (start, end, utc_offset) runs with a constant
+    zone offset. The zone is probed every OFFSET_PROBE_SECONDS and each
+    change is bisected down to its exact transition instant, which need not
+    fall on an hour (e.g. Australia/Lord_Howe). Transitions closer together
+    than the probe interval would be missed; no tz database zone has any.
+    """
+    segments = []
+    segment_start = start_seconds
+    current = _utc_offset(start_seconds, zone)
+    probe = start_seconds
+    while probe < end_seconds:
+        next_probe = min(probe + OFFSET_PROBE_SECONDS, end_seconds - 1)
+        if next_probe <= probe:
+            break
+        if _utc_offset(next_probe, zone) != current:
+            transition = _next_transition(probe, next_probe, zone)
+            segments.append((segment_start, transition, current))
+            segment_start, current = transition, _utc_offset(transition, zone)
+            probe = transition
+        else:
+            probe = next_probe
+    segments.append((segment_start, end_seconds, current))
+    return segments
+
+
+def _bucket_key(local_seconds, bucket: str):
+    """Bucket index for local epoch seconds; works on ints and SQL expressions"""
+    if bucket == "week":
+        # 1970-01-01 was a Thursday; shift so weeks start on Monday
+        return (local_seconds // 86400 + 3) // 7
+    return local_seconds // BUCKET_SIZES[bucket]
+
+
+def _bucket_start(key: int, bucket: str, zone) -> datetime:
+    if bucket == "week":
+        local = EPOCH + timedelta(days=key * 7 - 3)
+    else:
+        local = EPOCH + timedelta(seconds=key * BUCKET_SIZES[bucket])
+    return local.replace(tzinfo=zone)
+
+
+def timeseries(db: Session, start: datetime, end: datetime, bucket: str, zone) -> List[dict]:
+    """
+    Aggregate inquiry counts into local-time hour/day/week buckets.
+    start/end must be timezone-aware and on quarter-hour boundaries (see
+    snap_to_bucket); the range is [start, end).
+    """
+    if bucket not in BUCKET_SIZES:
+        raise ValueError("Bucket must be hour, day or week")
+    if end <= start:
+        raise ValueError("End must be after start")
+    if start.timestamp() % BUCKET_SECONDS or end.timestamp() % BUCKET_SECONDS:
+        raise ValueError("Start and end must fall on quarter-hour boundaries")
+
+    start_seconds = int(start.timestamp())
+    end_seconds = int(end.timestamp())
+    first_key = _bucket_key(start_seconds + _utc_offset(start_seconds, zone), bucket)
+    last_key = _bucket_key(end_seconds - 1 + _utc_offset(end_seconds - 1, zone), bucket)
+    if last_key - first_key + 1 > MAX_TIMESERIES_BUCKETS:
+        raise ValueError(f"Range too large: at most {MAX_TIMESERIES_BUCKETS} buckets per request")
+
+    # Bucketing happens in the database: within a constant-offset segment the
+    # local bucket is plain integer arithmetic on the quarter-hour index.
+    rollup = models.ContactInquiryRollup.__table__.c
+    methods = list(METHOD_COLUMNS)
+    counts = defaultdict(lambda: [0] * len(methods))
+    for segment_start, segment_end, offset in _offset_segments(start_seconds, end_seconds, zone):
+        key = _bucket_key(rollup.bucket * BUCKET_SECONDS + offset, bucket)
+        rows = db.execute(
+            select(key, *[func.sum(rollup[METHOD_COLUMNS[method]]) for method in methods])
+            # Transitions can fall inside a quarter-hour; each quarter goes to
+            # the segment in effect at its start so no quarter is counted twice
+            .where(rollup.bucket >= -(-segment_start // BUCKET_SECONDS))
+            .where(rollup.bucket < -(-segment_end // BUCKET_SECONDS))
+            .group_by(key)
+        ).all()
+        for bucket_key, *sums in rows:
+            totals = counts[bucket_key]
+            for i, value in enumerate(sums):
+                totals[i] += int(value or 0)
+
+    series = []
+    for key in range(first_key, last_key + 1):
+        totals = counts.get(key) or [0] * len(methods)
+        series.append({
+            "bucket_start": _bucket_start(key, bucket, zone),
+            "total": sum(totals),
+            "contact_methods": {method: n for method, n in zip(methods, totals) if n},
+        })
+    return series
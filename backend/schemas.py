@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr, validator
-from typing import Optional, List
+from typing import Optional, List, Dict
 from datetime import datetime
 import re
 
@@ -52,13 +52,17 @@ class ContactExport(BaseModel):
 class SearchResponse(BaseModel):
     search_term: str
     field: str
+    skip: int
+    limit: int
     count: int
+    approximate: bool = False
     results: List[ContactInquiryResponse]
 
 class PaginatedResponse(BaseModel):
     skip: int
     limit: int
     total: int
+    approximate: bool = False
     contacts: List[ContactInquiryResponse]
 
 class ContactStats(BaseModel):
@@ -78,13 +82,17 @@ class ContactExport(BaseModel):
 class SearchResponse(BaseModel):
     search_term: str
     field: str
+    skip: int
+    limit: int
     count: int
+    approximate: bool = False
     results: List[ContactInquiryResponse]
 
 class PaginatedResponse(BaseModel):
     skip: int
     limit: int
     total: int
+    approximate: bool = False
     contacts: List[ContactInquiryResponse]
 
 class ContactInquiryBase(BaseModel):
@@ -116,4 +124,16 @@ class ContactInquiryResponse(ContactInquiryBase):
     created_at: datetime
     
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class TimeseriesPoint(BaseModel):
+    bucket_start: datetime
+    total: int
+    contact_methods: Dict[str, int]
+
+class ContactTimeseries(BaseModel):
+    start: datetime
+    end: datetime
+    bucket: str
+    timezone: str
+    series: List[TimeseriesPoint]
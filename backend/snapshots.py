@@ -0,0 +1,95 @@
+"""
+Columnar (Parquet) snapshots of contact inquiries for analytics.
+
+Snapshots are ordered by id and keyed on an id watermark: a snapshot
+reports a watermark, and passing that back as `since` returns the
+inquiries added afterwards. Ids are used rather than created_at because
+bulk-imported backfills get new ids but old timestamps, and would be
+missed by a created_at watermark.
+
+Ids are assigned at INSERT but become visible at COMMIT, so an import
+chunk can commit after rows with higher ids. While a chunk is in flight
+the importer publishes the highest id it saw before inserting
+(ImportCheckpoint.in_flight_floor), and the watermark is capped at the
+lowest such floor, read in the same consistent snapshot as the rows.
+Delivery is therefore at-least-once: a pull can repeat rows from the
+previous one, and consumers should dedupe by id. An abandoned import
+holds the watermark back until it is resumed or restarted.
+"""
+import heapq
+from io import BytesIO
+from typing import Optional, Tuple
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+import models
+
+SNAPSHOT_BATCH_SIZE = 50000
+
+SNAPSHOT_SCHEMA = pa.schema([
+    ("id", pa.int64()),
+    ("full_name", pa.string()),
+    ("email", pa.string()),
+    ("phone_number", pa.string()),
+    # Only a handful of distinct values, so store them once per row group
+    ("preferred_contact_method", pa.dictionary(pa.int8(), pa.string())),
+    ("message", pa.string()),
+    ("created_at", pa.timestamp("us", tz="UTC")),
+])
+
+SNAPSHOT_COLUMNS = [field.name for field in SNAPSHOT_SCHEMA]
+
+
+def _rows(db: Session, table, since: Optional[int]):
+    query = db.query(*[getattr(table, column) for column in SNAPSHOT_COLUMNS])
+    if since is not None:
+        query = query.filter(table.id > since)
+    return query.order_by(table.id).execution_options(yield_per=SNAPSHOT_BATCH_SIZE)
+
+
+def _record_batch(rows) -> pa.RecordBatch:
+    columns = list(zip(*rows))
+    arrays = []
+    for field, values in zip(SNAPSHOT_SCHEMA, columns):
+        if pa.types.is_dictionary(field.type):
+            arrays.append(pa.array(values, pa.string()).dictionary_encode().cast(field.type))
+        else:
+            arrays.append(pa.array(values, field.type))
+    return pa.RecordBatch.from_arrays(arrays, schema=SNAPSHOT_SCHEMA)
+
+
+def write_snapshot(db: Session, since: Optional[int] = None, include_archived: bool = True) -> Tuple[bytes, int]:
+    """
+    Write inquiries with id > since to a Parquet file.
+    Returns (file contents, watermark to pass as `since` next time).
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        # One snapshot for the floor and the rows; MySQL defaults to REPEATABLE READ
+        # and SQLite serialises writers, so ids there already commit in order
+        db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+    floor = db.query(func.min(models.ImportCheckpoint.in_flight_floor)).scalar()
+
+    sources = [_rows(db, models.ContactInquiry, since)]
+    if include_archived:
+        sources.append(_rows(db, models.ContactInquiryArchive, since))
+    rows = heapq.merge(*sources, key=lambda row: row[0])
+
+    watermark = since or 0
+    output = BytesIO()
+    with pq.ParquetWriter(output, SNAPSHOT_SCHEMA, compression="zstd") as writer:
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= SNAPSHOT_BATCH_SIZE:
+                writer.write_batch(_record_batch(batch))
+                watermark = batch[-1][0]
+                batch = []
+        if batch:
+            writer.write_batch(_record_batch(batch))
+            watermark = batch[-1][0]
+    if floor is not None:
+        watermark = max(since or 0, min(watermark, floor))
+    return output.getvalue(), watermark